@@ -8,12 +8,16 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from pathlib import Path
 import numpy as np
 from datetime import datetime, timedelta
+import hashlib
+import importlib.util
+import os
+import tempfile
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -46,6 +50,15 @@ st.markdown(
             border-left: 4px solid #2a5298;
             transition: transform 0.2s;
         }
+        .metric-row {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 1rem;
+        }
+        .metric-row .metric-card {
+            flex: 1 1 10rem;
+            min-width: 10rem;
+        }
         .metric-card:hover {
             transform: translateY(-2px);
             box-shadow: 0 6px 20px rgba(0,0,0,0.15);
@@ -96,35 +109,59 @@ st.markdown(
 )
 
 # ---------- FUNÇÃO DE CARREGAMENTO --------------
+# Leitor em Rust (python-calamine) quando disponível; senão openpyxl em modo streaming
+if importlib.util.find_spec("python_calamine") is not None:
+    EXCEL_READ_KWARGS = {"engine": "calamine"}
+else:
+    EXCEL_READ_KWARGS = {"engine": "openpyxl", "engine_kwargs": {"read_only": True, "data_only": True}}
+
+WEEKDAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Mapeia aliases → nome canônico
+ALIASES = {
+    "Arrival Date":   ["Arrival Date", "Arrival", "Check-In", "Data De Chegada", "Checkin"],
+    "Departure Date": ["Departure Date", "Departure", "Check-Out", "Data De Saída", "Checkout"],
+    "Daily Rate":     ["Daily Rate", "Adr", "Tarifa Diária", "Rate", "Price"],
+    "Room Type":      ["Room Type", "Type", "Tipo De Quarto", "Category"],
+    "No Of Guests":   ["No Of Guests", "Guests", "Hóspedes", "Pax"],
+    "Room":           ["Room", "Room Number", "Quarto", "Número Do Quarto"]
+}
+KNOWN_HEADERS = {alias for names in ALIASES.values() for alias in names}
+
+def is_known_header(column) -> bool:
+    """Filtro de `usecols`: lê só as colunas que batem com algum alias."""
+    return str(column).strip().title() in KNOWN_HEADERS
+
 @st.cache_data(show_spinner=False)
-def load_dataframe(f) -> pd.DataFrame:
+def load_dataframe(f, mtime_ns: int | None = None) -> pd.DataFrame:
     """
     Recebe Path ou BytesIO de um Excel e devolve dataframe enriquecido.
     Aceita vários aliases para Arrival/Departure/Daily Rate.
+    `mtime_ns` diferencia versões do mesmo arquivo na chave do cache.
     """
+    # Guarda todos os cabeçalhos vistos pelo filtro para a mensagem de colunas ausentes
+    headers = []
+
+    def keep_column(column) -> bool:
+        headers.append(str(column).strip().title())
+        return is_known_header(column)
+
     try:
-        df = pd.read_excel(f)
+        df = pd.read_excel(f, usecols=keep_column, **EXCEL_READ_KWARGS)
     except Exception as e:
         st.error(f"❌ Erro ao ler arquivo Excel: {str(e)}")
         st.stop()
 
-    if df.empty:
+    available_columns = list(dict.fromkeys(headers))
+
+    # Sem nenhuma coluna reconhecida o frame vem 0x0: trata como colunas ausentes
+    if df.empty and (len(df.columns) > 0 or not available_columns):
         st.error("❌ Arquivo Excel está vazio!")
         st.stop()
 
     # Normaliza cabeçalhos: remove espaços e usa Title Case
     df.columns = df.columns.str.strip().str.title()
 
-    # Mapeia aliases → nome canônico
-    aliases = {
-        "Arrival Date":   ["Arrival Date", "Arrival", "Check-In", "Data De Chegada", "Checkin"],
-        "Departure Date": ["Departure Date", "Departure", "Check-Out", "Data De Saída", "Checkout"],
-        "Daily Rate":     ["Daily Rate", "Adr", "Tarifa Diária", "Rate", "Price"],
-        "Room Type":      ["Room Type", "Type", "Tipo De Quarto", "Category"],
-        "No Of Guests":   ["No Of Guests", "Guests", "Hóspedes", "Pax"],
-        "Room":           ["Room", "Room Number", "Quarto", "Número Do Quarto"]
-    }
-
     def first_present(possible):
         for c in possible:
             if c in df.columns:
@@ -135,7 +172,7 @@ def load_dataframe(f) -> pd.DataFrame:
     column_mapping = {}
     missing_columns = []
     
-    for canonical_name, possible_names in aliases.items():
+    for canonical_name, possible_names in ALIASES.items():
         found_column = first_present(possible_names)
         if found_column:
             column_mapping[found_column] = canonical_name
@@ -143,7 +180,7 @@ def load_dataframe(f) -> pd.DataFrame:
             missing_columns.append(canonical_name)
 
     if missing_columns:
-        st.error(f"❌ Colunas ausentes: {', '.join(missing_columns)}. Colunas disponíveis: {', '.join(df.columns.tolist())}")
+        st.error(f"❌ Colunas ausentes: {', '.join(missing_columns)}. Colunas disponíveis: {', '.join(available_columns)}")
         st.info("💡 Certifique-se de que o Excel contém pelo menos: Arrival Date, Departure Date, Daily Rate, Room Type, No Of Guests, Room")
         st.stop()
 
@@ -158,35 +195,158 @@ def load_dataframe(f) -> pd.DataFrame:
         st.error(f"❌ Erro ao converter datas: {str(e)}")
         st.stop()
 
+    try:
+        df["Daily Rate"] = pd.to_numeric(df["Daily Rate"])
+        df["No Of Guests"] = pd.to_numeric(df["No Of Guests"], downcast="unsigned")
+    except Exception as e:
+        st.error(f"❌ Erro ao converter colunas numéricas: {str(e)}")
+        st.stop()
+
     # Remove linhas com datas inválidas
     df = df.dropna(subset=["Arrival Date", "Departure Date"])
     
     # Valida se departure é depois de arrival
     invalid_dates = df["Departure Date"] <= df["Arrival Date"]
-    if invalid_dates.any():
-        st.warning(f"⚠️ {invalid_dates.sum()} reservas com datas inválidas foram removidas")
+    invalid_count = int(invalid_dates.sum())
+    if invalid_count:
         df = df[~invalid_dates]
 
-    # Calcula métricas derivadas
-    df["Nights"] = (df["Departure Date"] - df["Arrival Date"]).dt.days
-    df["Revenue"] = df["Daily Rate"] * df["Nights"]
-    df["Month"] = df["Arrival Date"].dt.to_period('M')
-    df["Year"] = df["Arrival Date"].dt.year
-    df["Weekday"] = df["Arrival Date"].dt.day_name()
+    # Calcula métricas derivadas numa única passada NumPy sobre as datas
+    arrival_ns = df["Arrival Date"].to_numpy(dtype="datetime64[ns]")
+    departure_ns = df["Departure Date"].to_numpy(dtype="datetime64[ns]")
+    # Noites = períodos completos de 24h (mesma semântica de .dt.days)
+    nights = ((departure_ns - arrival_ns) // np.timedelta64(1, "D")).astype("int32")
+    # Visão por dia só para os códigos de calendário (mês, ano, dia da semana)
+    arrival_d = arrival_ns.astype("datetime64[D]")
+    df["Nights"] = nights
+    df["Revenue"] = df["Daily Rate"].to_numpy() * nights
+    # Mês como código int32 (meses desde 1970-01); o rótulo é formatado só na exibição
+    df["MonthCode"] = arrival_d.astype("datetime64[M]").astype("int32")
+    df["Year"] = arrival_d.astype("datetime64[Y]").astype("int32") + 1970
+    # 1970-01-01 foi uma quinta-feira: (dias + 3) % 7 dá segunda = 0
+    weekday_codes = (arrival_d.view("i8") + 3) % 7
+    df["Weekday"] = pd.Categorical.from_codes(weekday_codes, categories=WEEKDAY_ORDER, ordered=True)
 
     # Remove outliers extremos
-    q1_rate = df["Daily Rate"].quantile(0.01)
-    q99_rate = df["Daily Rate"].quantile(0.99)
+    q1_rate, q99_rate = np.nanpercentile(df["Daily Rate"].to_numpy(dtype="float64"), [1, 99])
     df = df[(df["Daily Rate"] >= q1_rate) & (df["Daily Rate"] <= q99_rate)]
 
+    # Ordena por chegada para permitir filtro de período via searchsorted
+    df = df.sort_values("Arrival Date", kind="stable", ignore_index=True)
+
+    # Colunas de baixa cardinalidade como category (groupby/isin sobre códigos inteiros)
+    # Weekday já nasce como category ordenada em WEEKDAY_ORDER
+    df["Room Type"] = df["Room Type"].astype("category")
+    # Room tem alta cardinalidade: string Arrow em vez de objetos Python (nunique nativo)
+    df["Room"] = df["Room"].astype("string[pyarrow]")
+
+    # Vai junto no cache Parquet (metadados de attrs) para o aviso sobreviver a reinícios
+    df.attrs["invalid_dates_removed"] = invalid_count
+
+    return df
+
+def warn_removed_rows(df: pd.DataFrame) -> None:
+    """Avisa sobre reservas descartadas na carga, venha o df do Excel ou do cache."""
+    invalid_count = df.attrs.get("invalid_dates_removed", 0)
+    if invalid_count:
+        st.warning(f"⚠️ {invalid_count} reservas com datas inválidas foram removidas")
+
+# Incremente ao mudar colunas, dtypes ou ordenação produzidos por load_dataframe
+CACHE_VERSION = 2
+
+# Esquema esperado do cache: coluna → checagem de dtype
+CACHE_SCHEMA = {
+    "Arrival Date":   pd.api.types.is_datetime64_dtype,
+    "Departure Date": pd.api.types.is_datetime64_dtype,
+    "Daily Rate":     pd.api.types.is_numeric_dtype,
+    "Revenue":        pd.api.types.is_numeric_dtype,
+    # Células vazias fazem to_numeric devolver float64 em vez de inteiro
+    "No Of Guests":   pd.api.types.is_numeric_dtype,
+    "Nights":         pd.api.types.is_integer_dtype,
+    "MonthCode":      pd.api.types.is_integer_dtype,
+    "Year":           pd.api.types.is_integer_dtype,
+    "Room":           pd.api.types.is_string_dtype,
+    "Room Type":      lambda dtype: isinstance(dtype, pd.CategoricalDtype),
+    "Weekday":        lambda dtype: isinstance(dtype, pd.CategoricalDtype) and dtype.ordered
+                                    and list(dtype.categories) == WEEKDAY_ORDER,
+}
+
+@st.cache_data(show_spinner=False)
+def load_parquet(path: Path, mtime_ns: int) -> pd.DataFrame:
+    """
+    Lê o dataframe já enriquecido do cache Parquet e valida o esquema.
+    `mtime_ns` entra apenas na chave do cache para invalidar após regravação.
+    Levanta ValueError se o arquivo não corresponder ao que load_dataframe produz.
+    """
+    df = pd.read_parquet(path)
+
+    for column, check in CACHE_SCHEMA.items():
+        if column not in df.columns or not check(df[column].dtype):
+            raise ValueError(f"cache Parquet desatualizado: coluna {column!r}")
+
+    if "invalid_dates_removed" not in df.attrs:
+        raise ValueError("cache Parquet desatualizado: sem contagem de linhas removidas")
+
+    # O filtro de período (searchsorted) depende da ordenação por chegada
+    if not df["Arrival Date"].is_monotonic_increasing:
+        raise ValueError("cache Parquet desatualizado: linhas fora de ordem")
+
     return df
 
+def save_parquet(df: pd.DataFrame, path: Path) -> None:
+    """
+    Grava o cache Parquet de forma atômica (arquivo temporário + os.replace),
+    seguro para réplicas que compartilham o diretório.
+    Falhas de escrita mantêm só o cache em memória.
+    """
+    tmp_name = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False) as tmp:
+            tmp_name = tmp.name
+        df.to_parquet(tmp_name, engine="pyarrow", compression="zstd")
+        # NamedTemporaryFile cria com 0600; réplicas com outro uid precisam ler o cache
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except Exception:
+        if tmp_name is not None:
+            Path(tmp_name).unlink(missing_ok=True)
+
+# Validade dos Parquets de upload em .stcache (segundos)
+UPLOAD_CACHE_TTL = 24 * 60 * 60
+
+def prune_upload_cache(cache_dir: Path) -> None:
+    """Remove entradas (e temporários órfãos) mais antigas que UPLOAD_CACHE_TTL."""
+    cutoff = time.time() - UPLOAD_CACHE_TTL
+    try:
+        for entry in cache_dir.iterdir():
+            if entry.suffix in (".parquet", ".tmp") and entry.stat().st_mtime < cutoff:
+                entry.unlink(missing_ok=True)
+    except OSError:
+        pass  # diretório ausente ou entrada removida por outra réplica
+
 # ---------- BUSCA AUTOMÁTICA DO ARQUIVO ---------
 def load_data():
-    DATA_PATH = Path(__file__).parent / "Reservations.xlsx" if "__file__" in globals() else Path("Reservations.xlsx")
+    APP_DIR = Path(__file__).parent if "__file__" in globals() else Path(".")
+    DATA_PATH = APP_DIR / "Reservations.xlsx"
+    # Cache em disco dos uploads; aponte para um volume compartilhado entre réplicas
+    CACHE_DIR = Path(os.environ.get("RESERVATIONS_CACHE_DIR", APP_DIR / ".stcache"))
     
     if DATA_PATH.exists():
-        return load_dataframe(DATA_PATH)
+        # Identifica a versão dos dados para as chaves de cache das agregações
+        data_key = f"{DATA_PATH}:{DATA_PATH.stat().st_mtime_ns}"
+
+        # Usa o Parquet irmão (versionado) se ele for mais novo que o Excel
+        parquet_path = DATA_PATH.with_name(f"{DATA_PATH.stem}.v{CACHE_VERSION}.parquet")
+        if parquet_path.exists() and parquet_path.stat().st_mtime_ns >= DATA_PATH.stat().st_mtime_ns:
+            try:
+                return load_parquet(parquet_path, parquet_path.stat().st_mtime_ns), data_key
+            except Exception:
+                pass  # cache corrompido ou de outra versão: reprocessa o Excel
+
+        df = load_dataframe(DATA_PATH, DATA_PATH.stat().st_mtime_ns)
+        save_parquet(df, parquet_path)
+        return df, data_key
     else:
         st.markdown(
             """
@@ -205,14 +365,32 @@ def load_data():
         )
         
         if uploaded is not None:
-            return load_dataframe(uploaded)
+            # Uploads idênticos (mesmo SHA-1) reaproveitam o Parquet entre sessões e processos
+            data_key = hashlib.sha1(uploaded.getvalue()).hexdigest()
+            parquet_path = CACHE_DIR / f"{data_key}.v{CACHE_VERSION}.parquet"
+            try:
+                cache_mtime = parquet_path.stat().st_mtime
+            except OSError:
+                cache_mtime = None
+            if cache_mtime is not None and time.time() - cache_mtime < UPLOAD_CACHE_TTL:
+                try:
+                    return load_parquet(parquet_path, parquet_path.stat().st_mtime_ns), data_key
+                except Exception:
+                    pass  # cache corrompido ou de outra versão: reprocessa o Excel
+
+            df = load_dataframe(uploaded)
+            prune_upload_cache(CACHE_DIR)
+            save_parquet(df, parquet_path)
+            return df, data_key
         else:
             st.info("👆 Aguardando upload do arquivo...")
             st.stop()
 
 # ---------- CARREGA DADOS ------------------------
 with st.spinner("📊 Carregando dados..."):
-    df = load_data()
+    df, data_key = load_data()
+
+warn_removed_rows(df)
 
 if df is None or df.empty:
     st.error("❌ Não foi possível carregar os dados")
@@ -234,9 +412,9 @@ st.markdown(
 with st.sidebar:
     st.header("🎛️ Filtros")
     
-    # Filtro de período
-    min_date = df["Arrival Date"].min().date()
-    max_date = df["Arrival Date"].max().date()
+    # Filtro de período (df já vem ordenado por chegada)
+    min_date = df["Arrival Date"].iat[0].date()
+    max_date = df["Arrival Date"].iat[-1].date()
     
     date_range = st.date_input(
         "📅 Período de análise",
@@ -262,34 +440,242 @@ with st.sidebar:
         default=["Todos"]
     )
 
-# Aplica filtros
-df_filtered = df.copy()
+# ---------- DOWNSAMPLING DE SÉRIES --------------
+MAX_TREND_POINTS = 2000
 
-if len(date_range) == 2:
-    start_date, end_date = date_range
-    df_filtered = df_filtered[
-        (df_filtered["Arrival Date"].dt.date >= start_date) & 
-        (df_filtered["Arrival Date"].dt.date <= end_date)
-    ]
+def lttb_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Índices dos pontos mantidos pelo Largest-Triangle-Three-Buckets.
+    Usa a posição como eixo x (séries mensais igualmente espaçadas).
+    """
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype="float64")
+    # n_out - 2 buckets entre o primeiro e o último ponto
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Vértice C: média do próximo bucket (ou o último ponto)
+        if i < n_out - 3:
+            nlo, nhi = edges[i + 1], edges[i + 2]
+            cx, cy = (nlo + nhi - 1) / 2, y[nlo:nhi].mean()
+        else:
+            cx, cy = n - 1, y[-1]
+        xs = np.arange(lo, hi)
+        area = np.abs((a - cx) * (y[lo:hi] - y[a]) - (a - xs) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+
+    return keep
+
+# ---------- FILTROS E AGREGAÇÕES ----------------
+def apply_filters(df: pd.DataFrame, date_range: tuple, selected_room_types: tuple, selected_guests: tuple) -> pd.DataFrame:
+    """Aplica os filtros da barra lateral ao dataframe completo."""
+    df_filtered = df
+
+    if len(date_range) == 2:
+        start_date, end_date = date_range
+        # df está ordenado por chegada: o período vira um slice contíguo
+        arrival_ns = df["Arrival Date"].to_numpy(dtype="datetime64[ns]").view("i8")
+        lo = np.searchsorted(arrival_ns, np.datetime64(start_date, "ns").view("i8"), side="left")
+        hi = np.searchsorted(arrival_ns, np.datetime64(end_date + timedelta(days=1), "ns").view("i8"), side="left")
+        if lo > 0 or hi < len(df):
+            df_filtered = df.iloc[lo:hi]
+
+    # Sem cópia: quarto e hóspedes viram uma única máscara booleana
+    mask = np.ones(len(df_filtered), dtype=bool)
+
+    if "Todos" not in selected_room_types and selected_room_types:
+        mask &= df_filtered["Room Type"].isin(selected_room_types).to_numpy()
+
+    if "Todos" not in selected_guests and selected_guests:
+        mask &= df_filtered["No Of Guests"].isin(selected_guests).to_numpy()
+
+    return df_filtered if mask.all() else df_filtered.loc[mask]
+
+def compute_kpis(df_filtered: pd.DataFrame, total_rows: int) -> dict:
+    """Reduções dos KPIs sobre o dataframe já filtrado."""
+    total_revenue = df_filtered["Revenue"].sum()
+    unique_rooms = df_filtered["Room"].nunique()
+    return {
+        "total_reservations": len(df_filtered),
+        "total_revenue": total_revenue,
+        "avg_daily_rate": df_filtered["Daily Rate"].mean(),
+        "avg_length_stay": df_filtered["Nights"].mean(),
+        "occupancy_rate": len(df_filtered) / total_rows * 100 if total_rows > 0 else 0,
+        "revpar": total_revenue / unique_rooms if unique_rooms else 0.0,
+        "avg_guests": df_filtered["No Of Guests"].mean(),
+        "first_arrival": df_filtered["Arrival Date"].iat[0] if len(df_filtered) else pd.NaT,
+        "last_arrival": df_filtered["Arrival Date"].iat[-1] if len(df_filtered) else pd.NaT,
+    }
+
+@st.cache_data(show_spinner=False)
+def compute_all_time_kpis(_df: pd.DataFrame, data_key: str) -> dict:
+    """KPIs do conjunto completo, calculados uma vez por versão dos dados."""
+    return compute_kpis(_df, len(_df))
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def compute_summaries(_df: pd.DataFrame, data_key: str, date_range: tuple, selected_room_types: tuple, selected_guests: tuple) -> dict:
+    """
+    Filtra os dados e calcula KPIs e agregações de todos os gráficos.
+    O cache é indexado por `data_key` + filtros; `_df` não é hasheado.
+    """
+    df_filtered = apply_filters(_df, date_range, selected_room_types, selected_guests)
+
+    # Agregação única por tipo de quarto (gráficos e insights)
+    rt_agg = df_filtered.groupby("Room Type", sort=True, observed=True).agg(
+        revenue=("Revenue", "sum"),
+        adr=("Daily Rate", "mean")
+    )
+
+    guest_distribution = df_filtered["No Of Guests"].value_counts().reset_index()
+    guest_distribution.columns = ["No Of Guests", "Count"]
+
+    # Métricas ao longo do tempo: um único groupby mensal alimenta Tab2, Tab4 e insights
+    monthly_metrics = df_filtered.groupby("MonthCode").agg({
+        "Revenue": "sum",
+        "Daily Rate": "mean",
+        "Nights": "mean",
+        "Room": "nunique"
+    }).reset_index()
+    monthly_metrics["Month_str"] = np.datetime_as_string(monthly_metrics["MonthCode"].to_numpy().astype("datetime64[M]"))
+    monthly_revenue = monthly_metrics[["MonthCode", "Revenue", "Month_str"]]
+
+    # Weekday é category ordenada: basta reindexar as 7 contagens
+    weekday_counts = df_filtered["Weekday"].value_counts().reindex(WEEKDAY_ORDER, fill_value=0).reset_index()
+    weekday_counts.columns = ["Weekday", "Count"]
 
-if "Todos" not in selected_room_types and selected_room_types:
-    df_filtered = df_filtered[df_filtered["Room Type"].isin(selected_room_types)]
+    nights_distribution = df_filtered["Nights"].value_counts().head(10).reset_index()
+    nights_distribution.columns = ["Nights", "Count"]
+
+    # KPIs do período filtrado (sem filtro ativo, reaproveita os totais gerais)
+    if df_filtered is _df:
+        kpis = compute_all_time_kpis(_df, data_key)
+    else:
+        kpis = compute_kpis(df_filtered, len(_df))
+
+    return {
+        "kpis": kpis,
+        "rt_agg": rt_agg,
+        "guest_distribution": guest_distribution,
+        "monthly_revenue": monthly_revenue,
+        "weekday_counts": weekday_counts,
+        "nights_distribution": nights_distribution,
+        "monthly_metrics": monthly_metrics,
+    }
+
+summaries = compute_summaries(df, data_key, tuple(date_range), tuple(selected_room_types), tuple(selected_guests))
+kpi_values = summaries["kpis"]
+rt_agg = summaries["rt_agg"]
+monthly_revenue = summaries["monthly_revenue"]
+
+total_reservations = kpi_values["total_reservations"]
+total_revenue = kpi_values["total_revenue"]
+avg_daily_rate = kpi_values["avg_daily_rate"]
+avg_length_stay = kpi_values["avg_length_stay"]
+occupancy_rate = kpi_values["occupancy_rate"]
+revpar = kpi_values["revpar"]
+
+# ---------- CONSTRUÇÃO DOS GRÁFICOS -------------
+# Figuras em cache pelo conteúdo das pequenas tabelas agregadas:
+# reruns com os mesmos filtros não reconstroem nem revalidam os gráficos.
+# cache_resource devolve o mesmo objeto (cache_data faria pickle e revalidaria
+# a figura a cada acerto); st.plotly_chart só serializa, nunca altera a figura.
+# Traces montados direto com graph_objects, sem o overhead do Plotly Express.
+@st.cache_resource(show_spinner=False, max_entries=64)
+def build_revenue_by_room(rt_agg: pd.DataFrame) -> go.Figure:
+    fig = go.Figure(go.Bar(
+        x=rt_agg.index.astype(str),
+        y=rt_agg["revenue"],
+        marker=dict(color=rt_agg["revenue"], colorscale="Blues", showscale=True, colorbar=dict(title="Revenue"))
+    ))
+    fig.update_layout(height=400, showlegend=False, xaxis_title="Room Type", yaxis_title="Revenue")
+    return fig
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def build_guest_distribution(guest_distribution: pd.DataFrame) -> go.Figure:
+    fig = go.Figure(go.Pie(
+        labels=guest_distribution["No Of Guests"],
+        values=guest_distribution["Count"]
+    ))
+    fig.update_layout(height=400)
+    return fig
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def build_monthly_revenue(monthly_revenue: pd.DataFrame) -> go.Figure:
+    sampled = monthly_revenue.iloc[lttb_indices(monthly_revenue["Revenue"].to_numpy(), MAX_TREND_POINTS)]
+    fig = go.Figure(go.Scatter(
+        x=sampled["Month_str"],
+        y=sampled["Revenue"],
+        mode="lines+markers"
+    ))
+    fig.update_layout(height=400, xaxis_title="Month_str", yaxis_title="Revenue")
+    return fig
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def build_adr_by_room(rt_agg: pd.DataFrame) -> go.Figure:
+    fig = go.Figure(go.Bar(
+        x=rt_agg.index.astype(str),
+        y=rt_agg["adr"],
+        marker=dict(color=rt_agg["adr"], colorscale="Greens", showscale=True, colorbar=dict(title="Daily Rate"))
+    ))
+    fig.update_layout(height=400, showlegend=False, xaxis_title="Room Type", yaxis_title="Daily Rate")
+    return fig
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def build_weekday_counts(weekday_counts: pd.DataFrame) -> go.Figure:
+    fig = go.Figure(go.Bar(
+        x=weekday_counts["Weekday"].astype(str),
+        y=weekday_counts["Count"]
+    ))
+    fig.update_layout(height=400, xaxis_title="Weekday", yaxis_title="Count")
+    return fig
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def build_nights_distribution(nights_distribution: pd.DataFrame) -> go.Figure:
+    fig = go.Figure(go.Bar(
+        x=nights_distribution["Nights"],
+        y=nights_distribution["Count"]
+    ))
+    fig.update_layout(height=400, xaxis_title="Nights", yaxis_title="Count")
+    return fig
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def build_trends(monthly_metrics: pd.DataFrame) -> go.Figure:
+    fig = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=("Receita Mensal", "ADR Médio", "Estadia Média", "Quartos Únicos"),
+        specs=[[{"secondary_y": False}, {"secondary_y": False}],
+               [{"secondary_y": False}, {"secondary_y": False}]]
+    )
 
-if "Todos" not in selected_guests and selected_guests:
-    df_filtered = df_filtered[df_filtered["No Of Guests"].isin(selected_guests)]
+    trend_traces = [
+        ("Revenue", "Receita", 1, 1),
+        ("Daily Rate", "ADR", 1, 2),
+        ("Nights", "Estadia", 2, 1),
+        ("Room", "Quartos", 2, 2),
+    ]
+    month_labels = monthly_metrics["Month_str"].to_numpy()
+    for column, name, row, col in trend_traces:
+        # Limita cada série a MAX_TREND_POINTS pontos antes de enviar ao navegador
+        values = monthly_metrics[column].to_numpy()
+        keep = lttb_indices(values, MAX_TREND_POINTS)
+        fig.add_trace(
+            go.Scattergl(x=month_labels[keep], y=values[keep], name=name),
+            row=row, col=col
+        )
 
-# ---------- CÁLCULO DE KPIS ----------------------
-total_reservations = len(df_filtered)
-total_revenue = df_filtered["Revenue"].sum()
-avg_daily_rate = df_filtered["Daily Rate"].mean()
-avg_length_stay = df_filtered["Nights"].mean()
-occupancy_rate = len(df_filtered) / len(df) * 100 if len(df) > 0 else 0
-revpar = total_revenue / df_filtered["Room"].nunique() if df_filtered["Room"].nunique() > 0 else 0
+    fig.update_layout(height=600, showlegend=False, uirevision="trend")
+    return fig
 
 # ---------- DASHBOARD PRINCIPAL ------------------
 # KPIs principais
-col1, col2, col3, col4, col5, col6 = st.columns(6)
-
 kpis = [
     ("💰", "Receita Total", f"R$ {total_revenue:,.0f}"),
     ("🏨", "Total de Reservas", f"{total_reservations:,}"),
@@ -299,17 +685,16 @@ kpis = [
     ("💎", "RevPAR", f"R$ {revpar:.0f}")
 ]
 
-for col, (icon, label, value) in zip([col1, col2, col3, col4, col5, col6], kpis):
-    col.markdown(
-        f"""
-        <div class="metric-card">
-            <div style="font-size: 2rem; margin-bottom: 0.5rem;">{icon}</div>
-            <p class="metric-value">{value}</p>
-            <p class="metric-label">{label}</p>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
+# Todos os cards num único elemento markdown (uma mensagem ao frontend)
+kpi_cards = "".join(
+    f'<div class="metric-card">'
+    f'<div style="font-size: 2rem; margin-bottom: 0.5rem;">{icon}</div>'
+    f'<p class="metric-value">{value}</p>'
+    f'<p class="metric-label">{label}</p>'
+    f'</div>'
+    for icon, label, value in kpis
+)
+st.markdown(f'<div class="metric-row">{kpi_cards}</div>', unsafe_allow_html=True)
 
 st.markdown("---")
 
@@ -321,134 +706,39 @@ with tab1:
     
     with col1:
         st.subheader("Receita por Tipo de Quarto")
-        revenue_by_room = df_filtered.groupby("Room Type")["Revenue"].sum().reset_index()
-        fig1 = px.bar(
-            revenue_by_room,
-            x="Room Type",
-            y="Revenue",
-            title="",
-            color="Revenue",
-            color_continuous_scale="Blues"
-        )
-        fig1.update_layout(height=400, showlegend=False)
-        st.plotly_chart(fig1, use_container_width=True)
+        st.plotly_chart(build_revenue_by_room(rt_agg), use_container_width=True)
     
     with col2:
         st.subheader("Distribuição por Número de Hóspedes")
-        guest_distribution = df_filtered["No Of Guests"].value_counts().reset_index()
-        guest_distribution.columns = ["No Of Guests", "Count"]
-        fig2 = px.pie(
-            guest_distribution,
-            values="Count",
-            names="No Of Guests",
-            title=""
-        )
-        fig2.update_layout(height=400)
-        st.plotly_chart(fig2, use_container_width=True)
+        st.plotly_chart(build_guest_distribution(summaries["guest_distribution"]), use_container_width=True)
 
 with tab2:
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Receita Mensal")
-        monthly_revenue = df_filtered.groupby("Month")["Revenue"].sum().reset_index()
-        monthly_revenue["Month_str"] = monthly_revenue["Month"].astype(str)
-        fig3 = px.line(
-            monthly_revenue,
-            x="Month_str",
-            y="Revenue",
-            title="",
-            markers=True
-        )
-        fig3.update_layout(height=400)
-        st.plotly_chart(fig3, use_container_width=True)
+        st.plotly_chart(build_monthly_revenue(monthly_revenue), use_container_width=True)
     
     with col2:
         st.subheader("ADR por Tipo de Quarto")
-        adr_by_room = df_filtered.groupby("Room Type")["Daily Rate"].mean().reset_index()
-        fig4 = px.bar(
-            adr_by_room,
-            x="Room Type",
-            y="Daily Rate",
-            title="",
-            color="Daily Rate",
-            color_continuous_scale="Greens"
-        )
-        fig4.update_layout(height=400, showlegend=False)
-        st.plotly_chart(fig4, use_container_width=True)
+        st.plotly_chart(build_adr_by_room(rt_agg), use_container_width=True)
 
 with tab3:
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Ocupação por Dia da Semana")
-        weekday_counts = df_filtered["Weekday"].value_counts().reset_index()
-        weekday_counts.columns = ["Weekday", "Count"]
-        # Ordenar dias da semana
-        weekday_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        weekday_counts["Weekday"] = pd.Categorical(weekday_counts["Weekday"], categories=weekday_order, ordered=True)
-        weekday_counts = weekday_counts.sort_values("Weekday")
-        
-        fig5 = px.bar(
-            weekday_counts,
-            x="Weekday",
-            y="Count",
-            title=""
-        )
-        fig5.update_layout(height=400)
-        st.plotly_chart(fig5, use_container_width=True)
+        st.plotly_chart(build_weekday_counts(summaries["weekday_counts"]), use_container_width=True)
     
     with col2:
         st.subheader("Duração da Estadia")
-        nights_distribution = df_filtered["Nights"].value_counts().head(10).reset_index()
-        nights_distribution.columns = ["Nights", "Count"]
-        fig6 = px.bar(
-            nights_distribution,
-            x="Nights",
-            y="Count",
-            title=""
-        )
-        fig6.update_layout(height=400)
-        st.plotly_chart(fig6, use_container_width=True)
+        st.plotly_chart(build_nights_distribution(summaries["nights_distribution"]), use_container_width=True)
 
 with tab4:
     st.subheader("Análise de Tendências Temporal")
     
     # Métricas ao longo do tempo
-    monthly_metrics = df_filtered.groupby("Month").agg({
-        "Revenue": "sum",
-        "Daily Rate": "mean",
-        "Nights": "mean",
-        "Room": "nunique"
-    }).reset_index()
-    monthly_metrics["Month_str"] = monthly_metrics["Month"].astype(str)
-    
-    fig7 = make_subplots(
-        rows=2, cols=2,
-        subplot_titles=("Receita Mensal", "ADR Médio", "Estadia Média", "Quartos Únicos"),
-        specs=[[{"secondary_y": False}, {"secondary_y": False}],
-               [{"secondary_y": False}, {"secondary_y": False}]]
-    )
-    
-    fig7.add_trace(
-        go.Scatter(x=monthly_metrics["Month_str"], y=monthly_metrics["Revenue"], name="Receita"),
-        row=1, col=1
-    )
-    fig7.add_trace(
-        go.Scatter(x=monthly_metrics["Month_str"], y=monthly_metrics["Daily Rate"], name="ADR"),
-        row=1, col=2
-    )
-    fig7.add_trace(
-        go.Scatter(x=monthly_metrics["Month_str"], y=monthly_metrics["Nights"], name="Estadia"),
-        row=2, col=1
-    )
-    fig7.add_trace(
-        go.Scatter(x=monthly_metrics["Month_str"], y=monthly_metrics["Room"], name="Quartos"),
-        row=2, col=2
-    )
-    
-    fig7.update_layout(height=600, showlegend=False)
-    st.plotly_chart(fig7, use_container_width=True)
+    st.plotly_chart(build_trends(summaries["monthly_metrics"]), use_container_width=True)
 
 # ---------- INSIGHTS AUTOMÁTICOS ----------------
 st.markdown("---")
@@ -458,8 +748,8 @@ col1, col2 = st.columns(2)
 
 with col1:
     # Top performers
-    top_room_type = df_filtered.groupby("Room Type")["Revenue"].sum().idxmax()
-    top_room_revenue = df_filtered.groupby("Room Type")["Revenue"].sum().max()
+    top_room_type = rt_agg["revenue"].idxmax()
+    top_room_revenue = rt_agg["revenue"].loc[top_room_type]
     
     st.markdown(
         f"""
@@ -472,8 +762,8 @@ with col1:
     )
     
     # Oportunidades
-    lowest_adr_room = df_filtered.groupby("Room Type")["Daily Rate"].mean().idxmin()
-    lowest_adr = df_filtered.groupby("Room Type")["Daily Rate"].mean().min()
+    lowest_adr_room = rt_agg["adr"].idxmin()
+    lowest_adr = rt_agg["adr"].loc[lowest_adr_room]
     
     st.markdown(
         f"""
@@ -487,7 +777,7 @@ with col1:
 
 with col2:
     # Padrões sazonais
-    best_month = monthly_revenue.loc[monthly_revenue["Revenue"].idxmax(), "Month"] if not monthly_revenue.empty else "N/A"
+    best_month = monthly_revenue.loc[monthly_revenue["Revenue"].idxmax(), "Month_str"] if not monthly_revenue.empty else "N/A"
     
     st.markdown(
         f"""
@@ -500,7 +790,7 @@ with col2:
     )
     
     # Guest behavior
-    avg_guests = df_filtered["No Of Guests"].mean()
+    avg_guests = kpi_values["avg_guests"]
     st.markdown(
         f"""
         <div class="insight-box">
@@ -550,8 +840,8 @@ st.markdown("---")
 st.markdown(
     f"""
     <div style="text-align: center; color: #666; padding: 2rem;">
-        <p>📊 Dashboard atualizado automaticamente • {len(df_filtered)} reservas analisadas</p>
-        <p>Período: {df_filtered['Arrival Date'].min().strftime('%d/%m/%Y')} - {df_filtered['Arrival Date'].max().strftime('%d/%m/%Y')}</p>
+        <p>📊 Dashboard atualizado automaticamente • {total_reservations} reservas analisadas</p>
+        <p>Período: {kpi_values['first_arrival'].strftime('%d/%m/%Y')} - {kpi_values['last_arrival'].strftime('%d/%m/%Y')}</p>
     </div>
     """,
     unsafe_allow_html=True